@@ -184,11 +184,13 @@ def run_benchmark(branch: str, commit_id: str, commit_msg: str, num_tokens_to_ge
                 return_dict=False,
                 use_cache=True,
             )
+            torch.cuda.synchronize()
             end = perf_counter()
             first_eager_fwd_pass_time = end - start
             logger.info(f"completed first eager fwd pass in: {first_eager_fwd_pass_time}s")
             start = perf_counter()
             output = model.generate(**inputs, do_sample=False)
+            torch.cuda.synchronize()
             end = perf_counter()
             first_eager_generate_time = end - start
             logger.info(f"completed first eager generation in: {first_eager_generate_time}s")
@@ -210,11 +212,13 @@ def run_benchmark(branch: str, commit_id: str, commit_msg: str, num_tokens_to_ge
                 return_dict=False,
                 use_cache=True,
             )
+            torch.cuda.synchronize()
             end = perf_counter()
             second_eager_fwd_pass_time = end - start
             logger.info(f"completed second eager fwd pass in: {second_eager_fwd_pass_time}s")
             start = perf_counter()
             model.generate(**inputs, do_sample=False)
+            torch.cuda.synchronize()
             end = perf_counter()
             second_eager_generate_time = end - start
             logger.info(f"completed second eager generation in: {second_eager_generate_time}s")
@@ -348,6 +352,7 @@ def run_benchmark(branch: str, commit_id: str, commit_msg: str, num_tokens_to_ge
             # 3nd call
             start = perf_counter()
             output = model.generate(**inputs, past_key_values=past_key_values)
+            torch.cuda.synchronize()
             end = perf_counter()
             third_compile_generate_time = end - start
             logger.info(f"completed second compile generation in: {third_compile_generate_time}s")
@@ -363,6 +368,7 @@ def run_benchmark(branch: str, commit_id: str, commit_msg: str, num_tokens_to_ge
             # 4th call
             start = perf_counter()
             output = model.generate(**inputs, past_key_values=past_key_values)
+            torch.cuda.synchronize()
             end = perf_counter()
             fourth_compile_generate_time = end - start
             logger.info(f"completed second compile generation in: {fourth_compile_generate_time}s")
@@ -146,6 +146,16 @@ class ModelArguments:
             )
         },
     )
+    pad_to_multiple_of: bool = field(
+        default=False,
+        metadata={
+            "help": (
+                "Whether to pad the embedding layer to a multiple depending on the device. "
+                "For NVIDIA GPUs, this will be a multiple of 8 (tensor-core eligibility for the vocab GEMM), "
+                "for TPUs a multiple of 128."
+            )
+        },
+    )
 
     def __post_init__(self):
         if self.config_overrides is not None and (self.config_name is not None or self.model_name_or_path is not None):
@@ -445,9 +455,18 @@ def main():
 
     # We resize the embeddings only when necessary to avoid index errors. If you are creating a model from scratch
     # on a small vocab and want a smaller embedding size, remove this test.
+    # Padding the vocab to a multiple of 8 (GPU) / 128 (TPU) keeps the large lm-head GEMM on the
+    # tensor-core path; the extra logits are never produced by the tokenizer so the loss is unchanged.
+    pad_factor = 1
+    if model_args.pad_to_multiple_of:
+        if torch.cuda.is_available():
+            pad_factor = 8
+        elif is_torch_xla_available():
+            pad_factor = 128
+
     embedding_size = model.get_input_embeddings().weight.shape[0]
-    if len(tokenizer) > embedding_size:
-        model.resize_token_embeddings(len(tokenizer))
+    if len(tokenizer) > embedding_size or embedding_size % pad_factor != 0:
+        model.resize_token_embeddings(len(tokenizer), pad_to_multiple_of=pad_factor)
 
     # Preprocessing the datasets.
     # First we tokenize all the texts.
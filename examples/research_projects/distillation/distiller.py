@@ -18,11 +18,12 @@ Adapted in part from Facebook, Inc XLM model (https://github.com/facebookresearc
 
 import math
 import os
+import threading
 import time
 
 import psutil
 import torch
-from grouped_batch_sampler import GroupedBatchSampler, create_lengths_groups
+from grouped_batch_sampler import GroupedBatchSampler, TokenBudgetBatchSampler, create_lengths_groups
 from lm_seqs_dataset import LmSeqsDataset
 from torch import nn
 from torch.optim import AdamW
@@ -40,6 +41,62 @@ except ImportError:
     from tensorboardX import SummaryWriter
 
 
+class CUDAPrefetcher:
+    """
+    Wraps a DataLoader and issues the next batch's host-to-device copy on a dedicated CUDA
+    stream, so the transfer overlaps with the current step's compute instead of stalling the
+    main stream when the batch is consumed.
+    """
+
+    def __init__(self, loader, device):
+        self.loader = iter(loader)
+        self.device = device
+        self.stream = torch.cuda.Stream(device=device)
+        self.batch = None
+        self._preload()
+
+    def _preload(self):
+        try:
+            batch = next(self.loader)
+        except StopIteration:
+            self.batch = None
+            return
+        with torch.cuda.stream(self.stream):
+            self.batch = tuple(t.to(self.device, non_blocking=True) for t in batch)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.batch is None:
+            raise StopIteration
+        torch.cuda.current_stream().wait_stream(self.stream)
+        batch = self.batch
+        for t in batch:
+            t.record_stream(torch.cuda.current_stream())
+        self._preload()
+        return batch
+
+
+class MultiEpochBatchSampler:
+    """
+    Replays a batch sampler for `n_epochs` epochs as one continuous stream, so the DataLoader
+    iterator (and its worker/prefetch pipeline) survives epoch boundaries instead of being torn
+    down and rebuilt every epoch. Samplers that shuffle in `__iter__` reshuffle at each replay.
+    """
+
+    def __init__(self, batch_sampler, n_epochs):
+        self.batch_sampler = batch_sampler
+        self.n_epochs = n_epochs
+
+    def __iter__(self):
+        for _ in range(self.n_epochs):
+            yield from self.batch_sampler
+
+    def __len__(self):
+        return self.n_epochs * len(self.batch_sampler)
+
+
 class Distiller:
     def __init__(
         self, params: dict, dataset: LmSeqsDataset, token_probs: torch.tensor, student: nn.Module, teacher: nn.Module
@@ -61,13 +118,35 @@ class Distiller:
         else:
             sampler = DistributedSampler(dataset)
 
-        if params.group_by_size:
+        if params.max_tokens_per_batch > 0:
+            if params.n_gpu > 1:
+                raise ValueError("--max_tokens_per_batch is not supported with distributed training.")
+            sampler = TokenBudgetBatchSampler(lengths=dataset.lengths, max_tokens=params.max_tokens_per_batch)
+        elif params.group_by_size:
             groups = create_lengths_groups(lengths=dataset.lengths, k=params.max_model_input_size)
             sampler = GroupedBatchSampler(sampler=sampler, group_ids=groups, batch_size=params.batch_size)
         else:
             sampler = BatchSampler(sampler=sampler, batch_size=params.batch_size, drop_last=False)
 
-        self.dataloader = DataLoader(dataset=dataset, batch_sampler=sampler, collate_fn=dataset.batch_sequences)
+        if params.num_workers > (os.cpu_count() or 1):
+            logger.warning(
+                f"num_workers ({params.num_workers}) is larger than the number of CPUs ({os.cpu_count()}); "
+                "workers will compete for cores."
+            )
+        self.num_steps_epoch = len(sampler)
+
+        # Persistent workers amortize the fork + dataset init across epochs and a deeper prefetch
+        # queue keeps the training thread from blocking on the loader. The multi-epoch sampler
+        # turns the whole run into a single continuous iterator (no per-epoch restart).
+        self.dataloader = DataLoader(
+            dataset=dataset,
+            batch_sampler=MultiEpochBatchSampler(sampler, params.n_epoch),
+            collate_fn=dataset.batch_sequences,
+            pin_memory=params.n_gpu > 0,
+            num_workers=params.num_workers,
+            persistent_workers=params.num_workers > 0,
+            prefetch_factor=4 if params.num_workers > 0 else None,
+        )
 
         self.temperature = params.temperature
         assert self.temperature > 0.0
@@ -87,9 +166,6 @@ class Distiller:
             self.pred_probs = torch.FloatTensor([params.word_mask, params.word_keep, params.word_rand])
             self.pred_probs = self.pred_probs.to(f"cuda:{params.local_rank}") if params.n_gpu > 0 else self.pred_probs
             self.token_probs = token_probs.to(f"cuda:{params.local_rank}") if params.n_gpu > 0 else token_probs
-            if self.fp16:
-                self.pred_probs = self.pred_probs.half()
-                self.token_probs = self.token_probs.half()
         else:
             logger.info("Using CLM loss for LM step.")
 
@@ -108,7 +184,9 @@ class Distiller:
             self.last_loss_cos = 0
         self.last_log = 0
 
-        self.ce_loss_fct = nn.KLDivLoss(reduction="batchmean")
+        # log_target lets us feed the teacher distribution as log-probabilities, skipping the
+        # softmax materialization + log round-trip inside KLDivLoss.
+        self.ce_loss_fct = nn.KLDivLoss(reduction="batchmean", log_target=True)
         self.lm_loss_fct = nn.CrossEntropyLoss(ignore_index=-100)
         if self.alpha_mse > 0.0:
             self.mse_loss_fct = nn.MSELoss(reduction="sum")
@@ -117,7 +195,6 @@ class Distiller:
 
         logger.info("--- Initializing model optimizer")
         assert params.gradient_accumulation_steps >= 1
-        self.num_steps_epoch = len(self.dataloader)
         num_train_optimization_steps = (
             int(self.num_steps_epoch / params.gradient_accumulation_steps * params.n_epoch) + 1
         )
@@ -142,8 +219,17 @@ class Distiller:
             % sum([p.numel() for p in self.student.parameters() if p.requires_grad])
         )
         logger.info("------ Number of parameters (student): %i" % sum([p.numel() for p in self.student.parameters()]))
+        # The fused implementation updates all parameters in a single multi-tensor kernel launch
+        # instead of one small kernel per tensor; it requires the parameters to live on CUDA.
+        # Off-GPU, fall back to the _foreach_* multi-tensor path explicitly for the same reason.
+        use_fused = params.n_gpu > 0
         self.optimizer = AdamW(
-            optimizer_grouped_parameters, lr=params.learning_rate, eps=params.adam_epsilon, betas=(0.9, 0.98)
+            optimizer_grouped_parameters,
+            lr=params.learning_rate,
+            eps=params.adam_epsilon,
+            betas=(0.9, 0.98),
+            fused=use_fused,
+            foreach=None if use_fused else True,
         )
 
         warmup_steps = math.ceil(num_train_optimization_steps * params.warmup_prop)
@@ -151,33 +237,52 @@ class Distiller:
             self.optimizer, num_warmup_steps=warmup_steps, num_training_steps=num_train_optimization_steps
         )
 
+        # Mixed precision: keep the models in fp32 (master weights) and let autocast run the
+        # forward/backward matmuls in bf16 (Ampere+) or fp16. Loss scaling is only needed for fp16
+        # since bf16 has the same dynamic range as fp32.
+        self.amp_dtype = torch.bfloat16 if self.fp16 and torch.cuda.is_bf16_supported() else torch.float16
+        self.scaler = torch.cuda.amp.GradScaler(enabled=self.fp16 and self.amp_dtype == torch.float16)
         if self.fp16:
-            try:
-                from apex import amp
-            except ImportError:
-                raise ImportError("Please install apex from https://www.github.com/nvidia/apex to use fp16 training.")
-            logger.info(f"Using fp16 training: {self.params.fp16_opt_level} level")
-            self.student, self.optimizer = amp.initialize(
-                self.student, self.optimizer, opt_level=self.params.fp16_opt_level
-            )
-            self.teacher = self.teacher.half()
+            logger.info(f"Using mixed precision training with torch.cuda.amp.autocast ({self.amp_dtype}).")
+
+        if params.torch_compile:
+            # Graph capture + kernel fusion removes Python overhead and fuses the small
+            # pointwise/LayerNorm/GELU ops between the GEMMs. Batch shapes vary with the
+            # length-grouped sampler, so let Dynamo detect dynamic shapes on its own.
+            logger.info("Compiling student and teacher with torch.compile.")
+            self.student = torch.compile(self.student)
+            self.teacher = torch.compile(self.teacher)
 
         if self.multi_gpu:
+            from torch.nn.parallel import DistributedDataParallel
+
+            logger.info("Using nn.parallel.DistributedDataParallel for distributed training.")
+            # gradient_as_bucket_view points the .grad tensors into the allreduce buckets,
+            # removing the per-parameter grad->bucket copy during backward and halving grad memory.
+            self.student = DistributedDataParallel(
+                self.student,
+                device_ids=[params.local_rank],
+                output_device=params.local_rank,
+                find_unused_parameters=True,
+                gradient_as_bucket_view=True,
+            )
             if self.fp16:
-                from apex.parallel import DistributedDataParallel
+                from torch.distributed.algorithms.ddp_comm_hooks import default_hooks as comm_hooks
 
-                logger.info("Using apex.parallel.DistributedDataParallel for distributed training.")
-                self.student = DistributedDataParallel(self.student)
-            else:
-                from torch.nn.parallel import DistributedDataParallel
-
-                logger.info("Using nn.parallel.DistributedDataParallel for distributed training.")
-                self.student = DistributedDataParallel(
-                    self.student,
-                    device_ids=[params.local_rank],
-                    output_device=params.local_rank,
-                    find_unused_parameters=True,
-                )
+                # Halves the bytes sent over NCCL; gradients are upcast back before the update.
+                self.student.register_comm_hook(None, comm_hooks.bf16_compress_hook)
+
+        # Cached position row for building attention masks: sliced per batch instead of launching
+        # a fresh arange kernel on every step.
+        device = f"cuda:{params.local_rank}" if params.n_gpu > 0 else "cpu"
+        # (+8 headroom: round_batch may pad the sequence dimension up to the next multiple of 8)
+        self._positions = torch.arange(params.max_model_input_size + 8, dtype=torch.long, device=device)
+
+        # Checkpointing state: pinned host buffers + a dedicated copy stream for the D2H transfer,
+        # and a background thread for the (slow) pickling + disk write.
+        self._ckpt_stream = torch.cuda.Stream() if params.n_gpu > 0 else None
+        self._cpu_state_dict = None
+        self._save_thread = None
 
         self.is_master = params.is_master
         if self.is_master:
@@ -206,7 +311,7 @@ class Distiller:
         token_ids, lengths = self.round_batch(x=token_ids, lengths=lengths)
         assert token_ids.size(0) == lengths.size(0)
 
-        attn_mask = torch.arange(token_ids.size(1), dtype=torch.long, device=lengths.device) < lengths[:, None]
+        attn_mask = self._positions[: token_ids.size(1)] < lengths[:, None]
 
         bs, max_seq_len = token_ids.size()
         mlm_labels = token_ids.new(token_ids.size()).copy_(token_ids)
@@ -271,7 +376,7 @@ class Distiller:
         token_ids, lengths = self.round_batch(x=token_ids, lengths=lengths)
         assert token_ids.size(0) == lengths.size(0)
 
-        attn_mask = torch.arange(token_ids.size(1), dtype=torch.long, device=lengths.device) < lengths[:, None]
+        attn_mask = self._positions[: token_ids.size(1)] < lengths[:, None]
         clm_labels = token_ids.new(token_ids.size()).copy_(token_ids)
         clm_labels[~attn_mask] = -100  # previously `clm_labels[1-attn_mask] = -1`, cf pytorch 1.2.0 compatibility
 
@@ -329,40 +434,57 @@ class Distiller:
 
     def train(self):
         """
-        The real training loop.
+        The real training loop. The whole run consumes a single DataLoader iterator (the batch
+        sampler replays the dataset `n_epoch` times), so the worker and prefetch pipelines are
+        never torn down at epoch boundaries; epoch bookkeeping is driven by the step count.
         """
         if self.is_master:
             logger.info("Starting training")
         self.last_log = time.time()
         self.student.train()
         self.teacher.eval()
+        if self.multi_gpu:
+            torch.distributed.barrier()
+        if self.is_master:
+            logger.info(f"--- Starting epoch {self.epoch}/{self.params.n_epoch-1}")
 
-        for _ in range(self.params.n_epoch):
-            if self.is_master:
-                logger.info(f"--- Starting epoch {self.epoch}/{self.params.n_epoch-1}")
-            if self.multi_gpu:
-                torch.distributed.barrier()
-
-            iter_bar = tqdm(self.dataloader, desc="-Iter", disable=self.params.local_rank not in [-1, 0])
-            for batch in iter_bar:
-                if self.params.n_gpu > 0:
-                    batch = tuple(t.to(f"cuda:{self.params.local_rank}") for t in batch)
-
-                if self.mlm:
-                    token_ids, attn_mask, lm_labels = self.prepare_batch_mlm(batch=batch)
-                else:
-                    token_ids, attn_mask, lm_labels = self.prepare_batch_clm(batch=batch)
-                self.step(input_ids=token_ids, attention_mask=attn_mask, lm_labels=lm_labels)
+        if self.params.n_gpu > 0:
+            # The prefetcher moves batches to the GPU on a side stream (pinned host memory +
+            # non_blocking copies), so the next batch's transfer runs concurrently with the
+            # current step's backward/optimizer.
+            data_iterator = CUDAPrefetcher(self.dataloader, f"cuda:{self.params.local_rank}")
+        else:
+            data_iterator = self.dataloader
+        iter_bar = tqdm(
+            data_iterator,
+            desc="-Iter",
+            total=self.params.n_epoch * self.num_steps_epoch,
+            disable=self.params.local_rank not in [-1, 0],
+        )
+        for batch in iter_bar:
+            if self.mlm:
+                token_ids, attn_mask, lm_labels = self.prepare_batch_mlm(batch=batch)
+            else:
+                token_ids, attn_mask, lm_labels = self.prepare_batch_clm(batch=batch)
+            self.step(input_ids=token_ids, attention_mask=attn_mask, lm_labels=lm_labels)
 
-                iter_bar.update()
+            iter_bar.update()
+            # Only sync the on-device loss accumulators to the host at log time.
+            if self.n_total_iter % self.params.log_interval == 0:
                 iter_bar.set_postfix(
-                    {"Last_loss": f"{self.last_loss:.2f}", "Avg_cum_loss": f"{self.total_loss_epoch/self.n_iter:.2f}"}
+                    {
+                        "Last_loss": f"{self.last_loss:.2f}",
+                        "Avg_cum_loss": f"{self.total_loss_epoch/self.n_iter:.2f}",
+                    }
                 )
-            iter_bar.close()
 
-            if self.is_master:
-                logger.info(f"--- Ending epoch {self.epoch}/{self.params.n_epoch-1}")
-            self.end_epoch()
+            if self.n_iter == self.num_steps_epoch:
+                if self.is_master:
+                    logger.info(f"--- Ending epoch {self.epoch}/{self.params.n_epoch-1}")
+                self.end_epoch()
+                if self.is_master and self.epoch < self.params.n_epoch:
+                    logger.info(f"--- Starting epoch {self.epoch}/{self.params.n_epoch-1}")
+        iter_bar.close()
 
         if self.is_master:
             logger.info("Save very last checkpoint as `pytorch_model.bin`.")
@@ -380,84 +502,89 @@ class Distiller:
         attention_mask: `torch.tensor(bs, seq_length)` - The attention mask for self attention.
         lm_labels: `torch.tensor(bs, seq_length)` - The language modeling labels (mlm labels for MLM and clm labels for CLM).
         """
-        if self.mlm:
-            student_outputs = self.student(
-                input_ids=input_ids, attention_mask=attention_mask
-            )  # (bs, seq_length, voc_size)
-            with torch.no_grad():
-                teacher_outputs = self.teacher(
+        with torch.cuda.amp.autocast(enabled=self.fp16, dtype=self.amp_dtype):
+            if self.mlm:
+                student_outputs = self.student(
                     input_ids=input_ids, attention_mask=attention_mask
                 )  # (bs, seq_length, voc_size)
-        else:
-            student_outputs = self.student(input_ids=input_ids, attention_mask=None)  # (bs, seq_length, voc_size)
-            with torch.no_grad():
-                teacher_outputs = self.teacher(input_ids=input_ids, attention_mask=None)  # (bs, seq_length, voc_size)
-        s_logits, s_hidden_states = student_outputs["logits"], student_outputs["hidden_states"]
-        t_logits, t_hidden_states = teacher_outputs["logits"], teacher_outputs["hidden_states"]
-        assert s_logits.size() == t_logits.size()
-
-        # https://github.com/peterliht/knowledge-distillation-pytorch/blob/master/model/net.py#L100
-        # https://github.com/peterliht/knowledge-distillation-pytorch/issues/2
-        if self.params.restrict_ce_to_mask:
-            mask = (lm_labels > -1).unsqueeze(-1).expand_as(s_logits)  # (bs, seq_length, voc_size)
-        else:
-            mask = attention_mask.unsqueeze(-1).expand_as(s_logits)  # (bs, seq_length, voc_size)
-        s_logits_slct = torch.masked_select(s_logits, mask)  # (bs * seq_length * voc_size) modulo the 1s in mask
-        s_logits_slct = s_logits_slct.view(-1, s_logits.size(-1))  # (bs * seq_length, voc_size) modulo the 1s in mask
-        t_logits_slct = torch.masked_select(t_logits, mask)  # (bs * seq_length * voc_size) modulo the 1s in mask
-        t_logits_slct = t_logits_slct.view(-1, s_logits.size(-1))  # (bs * seq_length, voc_size) modulo the 1s in mask
-        assert t_logits_slct.size() == s_logits_slct.size()
-
-        loss_ce = (
-            self.ce_loss_fct(
-                nn.functional.log_softmax(s_logits_slct / self.temperature, dim=-1),
-                nn.functional.softmax(t_logits_slct / self.temperature, dim=-1),
+                with torch.no_grad():
+                    teacher_outputs = self.teacher(
+                        input_ids=input_ids, attention_mask=attention_mask
+                    )  # (bs, seq_length, voc_size)
+            else:
+                student_outputs = self.student(input_ids=input_ids, attention_mask=None)  # (bs, seq_length, voc_size)
+                with torch.no_grad():
+                    teacher_outputs = self.teacher(
+                        input_ids=input_ids, attention_mask=None
+                    )  # (bs, seq_length, voc_size)
+            s_logits, s_hidden_states = student_outputs["logits"], student_outputs["hidden_states"]
+            t_logits, t_hidden_states = teacher_outputs["logits"], teacher_outputs["hidden_states"]
+            assert s_logits.size() == t_logits.size()
+
+            # https://github.com/peterliht/knowledge-distillation-pytorch/blob/master/model/net.py#L100
+            # https://github.com/peterliht/knowledge-distillation-pytorch/issues/2
+            if self.params.restrict_ce_to_mask:
+                mask = (lm_labels > -1).unsqueeze(-1).expand_as(s_logits)  # (bs, seq_length, voc_size)
+            else:
+                mask = attention_mask.unsqueeze(-1).expand_as(s_logits)  # (bs, seq_length, voc_size)
+            s_logits_slct = torch.masked_select(s_logits, mask)  # (bs * seq_length * voc_size) modulo the 1s in mask
+            s_logits_slct = s_logits_slct.view(-1, s_logits.size(-1))  # (bs * seq_length, voc_size) modulo the 1s in mask
+            t_logits_slct = torch.masked_select(t_logits, mask)  # (bs * seq_length * voc_size) modulo the 1s in mask
+            t_logits_slct = t_logits_slct.view(-1, s_logits.size(-1))  # (bs * seq_length, voc_size) modulo the 1s in mask
+            assert t_logits_slct.size() == s_logits_slct.size()
+
+            loss_ce = (
+                self.ce_loss_fct(
+                    nn.functional.log_softmax(s_logits_slct / self.temperature, dim=-1),
+                    nn.functional.log_softmax(t_logits_slct / self.temperature, dim=-1),
+                )
+                * (self.temperature) ** 2
             )
-            * (self.temperature) ** 2
-        )
-        loss = self.alpha_ce * loss_ce
-
+            loss = self.alpha_ce * loss_ce
+
+            if self.alpha_mlm > 0.0:
+                loss_mlm = self.lm_loss_fct(s_logits.flatten(0, -2), lm_labels.flatten())
+                loss += self.alpha_mlm * loss_mlm
+            if self.alpha_clm > 0.0:
+                shift_logits = s_logits[..., :-1, :].contiguous()
+                shift_labels = lm_labels[..., 1:].contiguous()
+                loss_clm = self.lm_loss_fct(shift_logits.flatten(0, -2), shift_labels.flatten())
+                loss += self.alpha_clm * loss_clm
+
+            if self.alpha_mse > 0.0:
+                loss_mse = self.mse_loss_fct(s_logits_slct, t_logits_slct) / s_logits_slct.size(
+                    0
+                )  # Reproducing batchmean reduction
+                loss += self.alpha_mse * loss_mse
+            if self.alpha_cos > 0.0:
+                s_hidden_states = s_hidden_states[-1]  # (bs, seq_length, dim)
+                t_hidden_states = t_hidden_states[-1]  # (bs, seq_length, dim)
+                mask = attention_mask.unsqueeze(-1).expand_as(s_hidden_states)  # (bs, seq_length, dim)
+                assert s_hidden_states.size() == t_hidden_states.size()
+                dim = s_hidden_states.size(-1)
+
+                s_hidden_states_slct = torch.masked_select(s_hidden_states, mask)  # (bs * seq_length * dim)
+                s_hidden_states_slct = s_hidden_states_slct.view(-1, dim)  # (bs * seq_length, dim)
+                t_hidden_states_slct = torch.masked_select(t_hidden_states, mask)  # (bs * seq_length * dim)
+                t_hidden_states_slct = t_hidden_states_slct.view(-1, dim)  # (bs * seq_length, dim)
+
+                target = s_hidden_states_slct.new(s_hidden_states_slct.size(0)).fill_(1)  # (bs * seq_length,)
+                loss_cos = self.cosine_loss_fct(s_hidden_states_slct, t_hidden_states_slct, target)
+                loss += self.alpha_cos * loss_cos
+
+        # Accumulate the reporting losses on-device: calling `.item()` here would force a
+        # device-to-host sync on every step. They are only read back at log time.
+        self.total_loss_epoch += loss.detach()
+        self.last_loss = loss.detach()
+        self.last_loss_ce = loss_ce.detach()
         if self.alpha_mlm > 0.0:
-            loss_mlm = self.lm_loss_fct(s_logits.view(-1, s_logits.size(-1)), lm_labels.view(-1))
-            loss += self.alpha_mlm * loss_mlm
+            self.last_loss_mlm = loss_mlm.detach()
         if self.alpha_clm > 0.0:
-            shift_logits = s_logits[..., :-1, :].contiguous()
-            shift_labels = lm_labels[..., 1:].contiguous()
-            loss_clm = self.lm_loss_fct(shift_logits.view(-1, shift_logits.size(-1)), shift_labels.view(-1))
-            loss += self.alpha_clm * loss_clm
-
+            self.last_loss_clm = loss_clm.detach()
         if self.alpha_mse > 0.0:
-            loss_mse = self.mse_loss_fct(s_logits_slct, t_logits_slct) / s_logits_slct.size(
-                0
-            )  # Reproducing batchmean reduction
-            loss += self.alpha_mse * loss_mse
+            self.last_loss_mse = loss_mse.detach()
         if self.alpha_cos > 0.0:
-            s_hidden_states = s_hidden_states[-1]  # (bs, seq_length, dim)
-            t_hidden_states = t_hidden_states[-1]  # (bs, seq_length, dim)
-            mask = attention_mask.unsqueeze(-1).expand_as(s_hidden_states)  # (bs, seq_length, dim)
-            assert s_hidden_states.size() == t_hidden_states.size()
-            dim = s_hidden_states.size(-1)
-
-            s_hidden_states_slct = torch.masked_select(s_hidden_states, mask)  # (bs * seq_length * dim)
-            s_hidden_states_slct = s_hidden_states_slct.view(-1, dim)  # (bs * seq_length, dim)
-            t_hidden_states_slct = torch.masked_select(t_hidden_states, mask)  # (bs * seq_length * dim)
-            t_hidden_states_slct = t_hidden_states_slct.view(-1, dim)  # (bs * seq_length, dim)
-
-            target = s_hidden_states_slct.new(s_hidden_states_slct.size(0)).fill_(1)  # (bs * seq_length,)
-            loss_cos = self.cosine_loss_fct(s_hidden_states_slct, t_hidden_states_slct, target)
-            loss += self.alpha_cos * loss_cos
-
-        self.total_loss_epoch += loss.item()
-        self.last_loss = loss.item()
-        self.last_loss_ce = loss_ce.item()
-        if self.alpha_mlm > 0.0:
-            self.last_loss_mlm = loss_mlm.item()
-        if self.alpha_clm > 0.0:
-            self.last_loss_clm = loss_clm.item()
-        if self.alpha_mse > 0.0:
-            self.last_loss_mse = loss_mse.item()
-        if self.alpha_cos > 0.0:
-            self.last_loss_cos = loss_cos.item()
+            self.last_loss_cos = loss_cos.detach()
 
         self.optimize(loss)
 
@@ -479,22 +606,24 @@ class Distiller:
         if self.params.gradient_accumulation_steps > 1:
             loss = loss / self.params.gradient_accumulation_steps
 
-        if self.fp16:
-            from apex import amp
-
-            with amp.scale_loss(loss, self.optimizer) as scaled_loss:
-                scaled_loss.backward()
+        # Under DDP, only the backward that precedes the optimizer step needs to allreduce;
+        # no_sync() keeps the K-1 other micro-steps local so cross-GPU traffic is amortized.
+        is_boundary_step = (self.n_iter + 1) % self.params.gradient_accumulation_steps == 0
+        if self.multi_gpu and not is_boundary_step:
+            with self.student.no_sync():
+                self.scaler.scale(loss).backward()
         else:
-            loss.backward()
+            self.scaler.scale(loss).backward()
 
         self.iter()
         if self.n_iter % self.params.gradient_accumulation_steps == 0:
-            if self.fp16:
-                nn.utils.clip_grad_norm_(amp.master_params(self.optimizer), self.params.max_grad_norm)
-            else:
-                nn.utils.clip_grad_norm_(self.student.parameters(), self.params.max_grad_norm)
-            self.optimizer.step()
-            self.optimizer.zero_grad()
+            self.scaler.unscale_(self.optimizer)
+            nn.utils.clip_grad_norm_(self.student.parameters(), self.params.max_grad_norm)
+            self.scaler.step(self.optimizer)
+            self.scaler.update()
+            # set_to_none frees the grad buffers instead of writing zeros into them, skipping the
+            # per-parameter zeroing kernels; the next backward allocates them fresh.
+            self.optimizer.zero_grad(set_to_none=True)
             self.scheduler.step()
 
     def iter(self):
@@ -592,10 +721,41 @@ class Distiller:
     def save_checkpoint(self, checkpoint_name: str = "checkpoint.pth"):
         """
         Save the current state. Only by the master process.
+
+        The weights are copied to reusable pinned host buffers on a dedicated stream, then the
+        pickling and disk write run in a background thread so the training loop only pays for the
+        D2H copy instead of stalling for the whole serialization.
         """
         if not self.is_master:
             return
-        mdl_to_save = self.student.module if hasattr(self.student, "module") else self.student
+        # unwrap the DistributedDataParallel and torch.compile wrappers (in either nesting order)
+        # so the saved keys carry no module./_orig_mod. prefixes and match from_pretrained
+        mdl_to_save = self.student
+        while hasattr(mdl_to_save, "_orig_mod") or hasattr(mdl_to_save, "module"):
+            mdl_to_save = mdl_to_save._orig_mod if hasattr(mdl_to_save, "_orig_mod") else mdl_to_save.module
         mdl_to_save.config.save_pretrained(self.dump_path)
         state_dict = mdl_to_save.state_dict()
-        torch.save(state_dict, os.path.join(self.dump_path, checkpoint_name))
+
+        # The previous save must be done writing the shared buffers before we overwrite them.
+        if self._save_thread is not None:
+            self._save_thread.join()
+
+        if self._ckpt_stream is not None:
+            if self._cpu_state_dict is None:
+                self._cpu_state_dict = {
+                    k: torch.empty_like(v, device="cpu", pin_memory=True) for k, v in state_dict.items()
+                }
+            self._ckpt_stream.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(self._ckpt_stream):
+                for k, v in state_dict.items():
+                    self._cpu_state_dict[k].copy_(v, non_blocking=True)
+            self._ckpt_stream.synchronize()
+            state_dict = self._cpu_state_dict
+        else:
+            # on CPU there is no pinned snapshot: clone before handing off, otherwise the
+            # background write races the training loop mutating the live parameters
+            state_dict = {k: v.detach().clone() for k, v in state_dict.items()}
+
+        save_path = os.path.join(self.dump_path, checkpoint_name)
+        self._save_thread = threading.Thread(target=torch.save, args=(state_dict, save_path))
+        self._save_thread.start()
@@ -42,6 +42,50 @@ def create_lengths_groups(lengths, k=0):
     return groups
 
 
+class TokenBudgetBatchSampler(BatchSampler):
+    """
+    Yields batches whose padded size (`len(batch) * max_length_in_batch`) stays under a token
+    budget: batches of short sequences take proportionally more sequences instead of spending the
+    budget on PAD positions. Indices are sorted by length once so that batch members have similar
+    lengths, and the resulting batches are shuffled every epoch.
+
+    Not distributed-aware: use with a single process.
+
+    Arguments:
+        lengths (list[int]): Length of each sample in the dataset.
+        max_tokens (int): Padded-token budget per batch.
+        shuffle (bool): Whether to shuffle the order of the batches at each epoch.
+    """
+
+    def __init__(self, lengths, max_tokens, shuffle=True):
+        if max_tokens < max(lengths):
+            raise ValueError(f"max_tokens ({max_tokens}) is smaller than the longest sequence ({max(lengths)})")
+        batches = []
+        batch = []
+        batch_max_len = 0
+        for idx in np.argsort(np.asarray(lengths), kind="stable").tolist():
+            new_max_len = max(batch_max_len, lengths[idx])
+            if batch and (len(batch) + 1) * new_max_len > max_tokens:
+                batches.append(batch)
+                batch = []
+                new_max_len = lengths[idx]
+            batch.append(idx)
+            batch_max_len = new_max_len
+        if batch:
+            batches.append(batch)
+        self.batches = batches
+        self.shuffle = shuffle
+        logger.info(f"Built {len(batches)} batches under a budget of {max_tokens} padded tokens.")
+
+    def __iter__(self):
+        order = np.random.permutation(len(self.batches)) if self.shuffle else range(len(self.batches))
+        for i in order:
+            yield self.batches[i]
+
+    def __len__(self):
+        return len(self.batches)
+
+
 class GroupedBatchSampler(BatchSampler):
     """
     Wraps another sampler to yield a mini-batch of indices.
@@ -41,6 +41,16 @@ def main():
     parser.add_argument("--tokenizer_type", type=str, default="bert", choices=["bert", "roberta", "gpt2"])
     parser.add_argument("--tokenizer_name", type=str, default="bert-base-uncased", help="The tokenizer to use.")
     parser.add_argument("--dump_file", type=str, default="data/dump", help="The dump file prefix.")
+    parser.add_argument(
+        "--dump_format",
+        type=str,
+        default="pickle",
+        choices=["pickle", "memmap"],
+        help=(
+            "`pickle` dumps a list of arrays that is fully loaded in RAM at training time; `memmap` packs the "
+            "token ids in a flat binary file that is memory-mapped (pages shared across workers/ranks)."
+        ),
+    )
     args = parser.parse_args()
 
     logger.info(f"Loading Tokenizer ({args.tokenizer_name})")
@@ -81,16 +91,23 @@ def main():
     logger.info("Finished binarization")
     logger.info(f"{len(data)} examples processed.")
 
-    dp_file = f"{args.dump_file}.{args.tokenizer_name}.pickle"
     vocab_size = tokenizer.vocab_size
     if vocab_size < (1 << 16):
         rslt_ = [np.uint16(d) for d in rslt]
     else:
         rslt_ = [np.int32(d) for d in rslt]
     random.shuffle(rslt_)
-    logger.info(f"Dump to {dp_file}")
-    with open(dp_file, "wb") as handle:
-        pickle.dump(rslt_, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+    if args.dump_format == "memmap":
+        dp_file = f"{args.dump_file}.{args.tokenizer_name}.bin"
+        logger.info(f"Dump to {dp_file}")
+        np.concatenate(rslt_).tofile(dp_file)
+        np.save(f"{dp_file}.lengths.npy", np.array([len(d) for d in rslt_], dtype=np.int64))
+    else:
+        dp_file = f"{args.dump_file}.{args.tokenizer_name}.pickle"
+        logger.info(f"Dump to {dp_file}")
+        with open(dp_file, "wb") as handle:
+            pickle.dump(rslt_, handle, protocol=pickle.HIGHEST_PROTOCOL)
 
 
 if __name__ == "__main__":
@@ -180,12 +180,27 @@ def main():
 
     parser.add_argument("--n_epoch", type=int, default=3, help="Number of pass on the whole dataset.")
     parser.add_argument("--batch_size", type=int, default=5, help="Batch size (for each process).")
+    parser.add_argument(
+        "--max_tokens_per_batch",
+        type=int,
+        default=-1,
+        help=(
+            "If >0, build batches under this padded-token budget (batch size then adapts to sequence length, "
+            "removing wasted PAD compute) instead of a fixed batch_size. Single-GPU only."
+        ),
+    )
     parser.add_argument(
         "--group_by_size",
         action="store_false",
         help="If true, group sequences that have similar length into the same batch. Default is true.",
     )
 
+    parser.add_argument(
+        "--num_workers",
+        type=int,
+        default=max(2, (os.cpu_count() or 1) // max(1, int(os.environ.get("WORLD_SIZE", "1")))),
+        help="Number of DataLoader workers per process (defaults to cpu_count // world_size).",
+    )
     parser.add_argument(
         "--gradient_accumulation_steps",
         type=int,
@@ -202,16 +217,12 @@ def main():
     parser.add_argument(
         "--fp16",
         action="store_true",
-        help="Whether to use 16-bit (mixed) precision (through NVIDIA apex) instead of 32-bit",
+        help="Whether to use 16-bit (mixed) precision (through torch.cuda.amp) instead of 32-bit",
     )
     parser.add_argument(
-        "--fp16_opt_level",
-        type=str,
-        default="O1",
-        help=(
-            "For fp16: Apex AMP optimization level selected in ['O0', 'O1', 'O2', and 'O3']. "
-            "See details at https://nvidia.github.io/apex/amp.html"
-        ),
+        "--torch_compile",
+        action="store_true",
+        help="Whether to wrap the student and teacher with torch.compile for fused kernels.",
     )
     parser.add_argument("--n_gpu", type=int, default=1, help="Number of GPUs in the node.")
     parser.add_argument("--local_rank", type=int, default=-1, help="Distributed training - Local rank")
@@ -225,6 +236,12 @@ def main():
     # ARGS #
     init_gpu_params(args)
     set_seed(args)
+
+    # One-time backend setup: allow TF32 tensor-core matmuls for fp32 ops and let cuDNN
+    # auto-tune its algorithms (batch shapes repeat across steps thanks to the length grouping).
+    torch.set_float32_matmul_precision("high")
+    torch.backends.cudnn.benchmark = True
+
     if args.is_master:
         if os.path.exists(args.dump_path):
             if not args.force:
@@ -260,8 +277,18 @@ def main():
 
     # DATA LOADER #
     logger.info(f"Loading data from {args.data_file}")
-    with open(args.data_file, "rb") as fp:
-        data = pickle.load(fp)
+    if args.data_file.endswith(".bin"):
+        # Packed dump produced by `scripts/binarized_data.py --dump_format memmap`: the flat token
+        # stream is mapped read-only (pages are shared across DataLoader workers and ranks) and
+        # every sequence is a zero-copy view into it, instead of unpickling the whole corpus in RAM.
+        token_dtype = np.uint16 if tokenizer.vocab_size < (1 << 16) else np.int32
+        token_stream = np.memmap(args.data_file, dtype=token_dtype, mode="r")
+        lengths = np.load(f"{args.data_file}.lengths.npy")
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        data = [token_stream[offsets[i] : offsets[i + 1]] for i in range(len(lengths))]
+    else:
+        with open(args.data_file, "rb") as fp:
+            data = pickle.load(fp)
 
     if args.mlm:
         logger.info(f"Loading token counts from {args.token_counts} (already pre-computed)")
@@ -279,8 +306,11 @@ def main():
     logger.info("Data loader created.")
 
     # STUDENT #
+    # Route self-attention through torch.nn.functional.scaled_dot_product_attention so that the
+    # fused (FlashAttention/memory-efficient) kernels are used instead of materializing the full
+    # attention matrix in the eager implementation.
     logger.info(f"Loading student config from {args.student_config}")
-    stu_architecture_config = student_config_class.from_pretrained(args.student_config)
+    stu_architecture_config = student_config_class.from_pretrained(args.student_config, attn_implementation="sdpa")
     stu_architecture_config.output_hidden_states = True
 
     if args.student_pretrained_weights is not None:
@@ -294,7 +324,9 @@ def main():
     logger.info("Student loaded.")
 
     # TEACHER #
-    teacher = teacher_model_class.from_pretrained(args.teacher_name, output_hidden_states=True)
+    teacher = teacher_model_class.from_pretrained(
+        args.teacher_name, output_hidden_states=True, attn_implementation="sdpa"
+    )
     if args.n_gpu > 0:
         teacher.to(f"cuda:{args.local_rank}")
     logger.info(f"Teacher loaded from {args.teacher_name}.")
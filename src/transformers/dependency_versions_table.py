@@ -1,101 +1,104 @@
 # THIS FILE HAS BEEN AUTOGENERATED. To update:
 # 1. modify the `_deps` dict in setup.py
 # 2. run `make deps_table_update``
+import sys
+
+
 deps = {
-    "Pillow": "Pillow>=10.0.1,<=15.0",
-    "accelerate": "accelerate>=0.26.0",
-    "av": "av==9.2.0",
-    "beautifulsoup4": "beautifulsoup4",
-    "blobfile": "blobfile",
-    "codecarbon": "codecarbon==1.2.0",
-    "cookiecutter": "cookiecutter==1.7.3",
-    "dataclasses": "dataclasses",
-    "datasets": "datasets!=2.5.0",
-    "deepspeed": "deepspeed>=0.9.3",
-    "diffusers": "diffusers",
-    "dill": "dill<0.3.5",
-    "evaluate": "evaluate>=0.2.0",
-    "faiss-cpu": "faiss-cpu",
-    "fastapi": "fastapi",
-    "filelock": "filelock",
-    "flax": "flax>=0.4.1,<=0.7.0",
-    "fsspec": "fsspec<2023.10.0",
-    "ftfy": "ftfy",
-    "fugashi": "fugashi>=1.0",
-    "GitPython": "GitPython<3.1.19",
-    "hf-doc-builder": "hf-doc-builder>=0.3.0",
-    "huggingface-hub": "huggingface-hub>=0.23.2,<1.0",
-    "importlib_metadata": "importlib_metadata",
-    "ipadic": "ipadic>=1.0.0,<2.0",
-    "isort": "isort>=5.5.4",
-    "jax": "jax>=0.4.1,<=0.4.13",
-    "jaxlib": "jaxlib>=0.4.1,<=0.4.13",
-    "jieba": "jieba",
-    "jinja2": "jinja2>=3.1.0",
-    "kenlm": "kenlm",
-    "keras": "keras>2.9,<2.16",
-    "keras-nlp": "keras-nlp>=0.3.1,<0.14.0",
-    "librosa": "librosa",
-    "nltk": "nltk<=3.8.1",
-    "natten": "natten>=0.14.6,<0.15.0",
-    "numpy": "numpy>=1.17",
-    "onnxconverter-common": "onnxconverter-common",
-    "onnxruntime-tools": "onnxruntime-tools>=1.4.2",
-    "onnxruntime": "onnxruntime>=1.4.0",
-    "opencv-python": "opencv-python",
-    "optimum-benchmark": "optimum-benchmark>=0.3.0",
-    "optuna": "optuna",
-    "optax": "optax>=0.0.8,<=0.1.4",
-    "packaging": "packaging>=20.0",
-    "parameterized": "parameterized",
-    "phonemizer": "phonemizer",
-    "protobuf": "protobuf",
-    "psutil": "psutil",
-    "pyyaml": "pyyaml>=5.1",
-    "pydantic": "pydantic",
-    "pytest": "pytest>=7.2.0,<8.0.0",
-    "pytest-timeout": "pytest-timeout",
-    "pytest-xdist": "pytest-xdist",
-    "python": "python>=3.9.0",
-    "ray[tune]": "ray[tune]>=2.7.0",
-    "regex": "regex!=2019.12.17",
-    "requests": "requests",
-    "rhoknp": "rhoknp>=1.1.0,<1.3.1",
-    "rjieba": "rjieba",
-    "rouge-score": "rouge-score!=0.0.7,!=0.0.8,!=0.1,!=0.1.1",
-    "ruff": "ruff==0.5.1",
-    "sacrebleu": "sacrebleu>=1.4.12,<2.0.0",
-    "sacremoses": "sacremoses",
-    "safetensors": "safetensors>=0.4.1",
-    "sagemaker": "sagemaker>=2.31.0",
-    "schedulefree": "schedulefree>=1.2.6",
-    "scikit-learn": "scikit-learn",
-    "scipy": "scipy<1.13.0",
-    "sentencepiece": "sentencepiece>=0.1.91,!=0.1.92",
-    "sigopt": "sigopt",
-    "starlette": "starlette",
-    "sudachipy": "sudachipy>=0.6.6",
-    "sudachidict_core": "sudachidict_core>=20220729",
-    "tensorboard": "tensorboard",
-    "tensorflow-cpu": "tensorflow-cpu>2.9,<2.16",
-    "tensorflow": "tensorflow>2.9,<2.16",
-    "tensorflow-text": "tensorflow-text<2.16",
-    "tensorflow-probability": "tensorflow-probability<0.24",
-    "tf2onnx": "tf2onnx",
-    "timeout-decorator": "timeout-decorator",
-    "tiktoken": "tiktoken",
-    "timm": "timm<=0.9.16",
-    "tokenizers": "tokenizers>=0.20,<0.21",
-    "torch": "torch",
-    "torchaudio": "torchaudio",
-    "torchvision": "torchvision",
-    "pyctcdecode": "pyctcdecode>=0.4.0",
-    "tqdm": "tqdm>=4.27",
-    "unidic": "unidic>=1.0.2",
-    "unidic_lite": "unidic_lite>=1.0.7",
-    "urllib3": "urllib3<2.0.0",
-    "uvicorn": "uvicorn",
-    "pytest-rich": "pytest-rich",
-    "libcst": "libcst",
-    "rich": "rich",
+    sys.intern("Pillow"): sys.intern("Pillow>=10.0.1,<=15.0"),
+    sys.intern("accelerate"): sys.intern("accelerate>=0.26.0"),
+    sys.intern("av"): sys.intern("av==9.2.0"),
+    sys.intern("beautifulsoup4"): sys.intern("beautifulsoup4"),
+    sys.intern("blobfile"): sys.intern("blobfile"),
+    sys.intern("codecarbon"): sys.intern("codecarbon==1.2.0"),
+    sys.intern("cookiecutter"): sys.intern("cookiecutter==1.7.3"),
+    sys.intern("dataclasses"): sys.intern("dataclasses"),
+    sys.intern("datasets"): sys.intern("datasets!=2.5.0"),
+    sys.intern("deepspeed"): sys.intern("deepspeed>=0.9.3"),
+    sys.intern("diffusers"): sys.intern("diffusers"),
+    sys.intern("dill"): sys.intern("dill<0.3.5"),
+    sys.intern("evaluate"): sys.intern("evaluate>=0.2.0"),
+    sys.intern("faiss-cpu"): sys.intern("faiss-cpu"),
+    sys.intern("fastapi"): sys.intern("fastapi"),
+    sys.intern("filelock"): sys.intern("filelock"),
+    sys.intern("flax"): sys.intern("flax>=0.4.1,<=0.7.0"),
+    sys.intern("fsspec"): sys.intern("fsspec<2023.10.0"),
+    sys.intern("ftfy"): sys.intern("ftfy"),
+    sys.intern("fugashi"): sys.intern("fugashi>=1.0"),
+    sys.intern("GitPython"): sys.intern("GitPython<3.1.19"),
+    sys.intern("hf-doc-builder"): sys.intern("hf-doc-builder>=0.3.0"),
+    sys.intern("huggingface-hub"): sys.intern("huggingface-hub>=0.23.2,<1.0"),
+    sys.intern("importlib_metadata"): sys.intern("importlib_metadata"),
+    sys.intern("ipadic"): sys.intern("ipadic>=1.0.0,<2.0"),
+    sys.intern("isort"): sys.intern("isort>=5.5.4"),
+    sys.intern("jax"): sys.intern("jax>=0.4.1,<=0.4.13"),
+    sys.intern("jaxlib"): sys.intern("jaxlib>=0.4.1,<=0.4.13"),
+    sys.intern("jieba"): sys.intern("jieba"),
+    sys.intern("jinja2"): sys.intern("jinja2>=3.1.0"),
+    sys.intern("kenlm"): sys.intern("kenlm"),
+    sys.intern("keras"): sys.intern("keras>2.9,<2.16"),
+    sys.intern("keras-nlp"): sys.intern("keras-nlp>=0.3.1,<0.14.0"),
+    sys.intern("librosa"): sys.intern("librosa"),
+    sys.intern("nltk"): sys.intern("nltk<=3.8.1"),
+    sys.intern("natten"): sys.intern("natten>=0.14.6,<0.15.0"),
+    sys.intern("numpy"): sys.intern("numpy>=1.17"),
+    sys.intern("onnxconverter-common"): sys.intern("onnxconverter-common"),
+    sys.intern("onnxruntime-tools"): sys.intern("onnxruntime-tools>=1.4.2"),
+    sys.intern("onnxruntime"): sys.intern("onnxruntime>=1.4.0"),
+    sys.intern("opencv-python"): sys.intern("opencv-python"),
+    sys.intern("optimum-benchmark"): sys.intern("optimum-benchmark>=0.3.0"),
+    sys.intern("optuna"): sys.intern("optuna"),
+    sys.intern("optax"): sys.intern("optax>=0.0.8,<=0.1.4"),
+    sys.intern("packaging"): sys.intern("packaging>=20.0"),
+    sys.intern("parameterized"): sys.intern("parameterized"),
+    sys.intern("phonemizer"): sys.intern("phonemizer"),
+    sys.intern("protobuf"): sys.intern("protobuf"),
+    sys.intern("psutil"): sys.intern("psutil"),
+    sys.intern("pyyaml"): sys.intern("pyyaml>=5.1"),
+    sys.intern("pydantic"): sys.intern("pydantic"),
+    sys.intern("pytest"): sys.intern("pytest>=7.2.0,<8.0.0"),
+    sys.intern("pytest-timeout"): sys.intern("pytest-timeout"),
+    sys.intern("pytest-xdist"): sys.intern("pytest-xdist"),
+    sys.intern("python"): sys.intern("python>=3.9.0"),
+    sys.intern("ray[tune]"): sys.intern("ray[tune]>=2.7.0"),
+    sys.intern("regex"): sys.intern("regex!=2019.12.17"),
+    sys.intern("requests"): sys.intern("requests"),
+    sys.intern("rhoknp"): sys.intern("rhoknp>=1.1.0,<1.3.1"),
+    sys.intern("rjieba"): sys.intern("rjieba"),
+    sys.intern("rouge-score"): sys.intern("rouge-score!=0.0.7,!=0.0.8,!=0.1,!=0.1.1"),
+    sys.intern("ruff"): sys.intern("ruff==0.5.1"),
+    sys.intern("sacrebleu"): sys.intern("sacrebleu>=1.4.12,<2.0.0"),
+    sys.intern("sacremoses"): sys.intern("sacremoses"),
+    sys.intern("safetensors"): sys.intern("safetensors>=0.4.1"),
+    sys.intern("sagemaker"): sys.intern("sagemaker>=2.31.0"),
+    sys.intern("schedulefree"): sys.intern("schedulefree>=1.2.6"),
+    sys.intern("scikit-learn"): sys.intern("scikit-learn"),
+    sys.intern("scipy"): sys.intern("scipy<1.13.0"),
+    sys.intern("sentencepiece"): sys.intern("sentencepiece>=0.1.91,!=0.1.92"),
+    sys.intern("sigopt"): sys.intern("sigopt"),
+    sys.intern("starlette"): sys.intern("starlette"),
+    sys.intern("sudachipy"): sys.intern("sudachipy>=0.6.6"),
+    sys.intern("sudachidict_core"): sys.intern("sudachidict_core>=20220729"),
+    sys.intern("tensorboard"): sys.intern("tensorboard"),
+    sys.intern("tensorflow-cpu"): sys.intern("tensorflow-cpu>2.9,<2.16"),
+    sys.intern("tensorflow"): sys.intern("tensorflow>2.9,<2.16"),
+    sys.intern("tensorflow-text"): sys.intern("tensorflow-text<2.16"),
+    sys.intern("tensorflow-probability"): sys.intern("tensorflow-probability<0.24"),
+    sys.intern("tf2onnx"): sys.intern("tf2onnx"),
+    sys.intern("timeout-decorator"): sys.intern("timeout-decorator"),
+    sys.intern("tiktoken"): sys.intern("tiktoken"),
+    sys.intern("timm"): sys.intern("timm<=0.9.16"),
+    sys.intern("tokenizers"): sys.intern("tokenizers>=0.20,<0.21"),
+    sys.intern("torch"): sys.intern("torch"),
+    sys.intern("torchaudio"): sys.intern("torchaudio"),
+    sys.intern("torchvision"): sys.intern("torchvision"),
+    sys.intern("pyctcdecode"): sys.intern("pyctcdecode>=0.4.0"),
+    sys.intern("tqdm"): sys.intern("tqdm>=4.27"),
+    sys.intern("unidic"): sys.intern("unidic>=1.0.2"),
+    sys.intern("unidic_lite"): sys.intern("unidic_lite>=1.0.7"),
+    sys.intern("urllib3"): sys.intern("urllib3<2.0.0"),
+    sys.intern("uvicorn"): sys.intern("uvicorn"),
+    sys.intern("pytest-rich"): sys.intern("pytest-rich"),
+    sys.intern("libcst"): sys.intern("libcst"),
+    sys.intern("rich"): sys.intern("rich"),
 }
@@ -410,7 +410,11 @@ def normalize(
     if input_data_format == ChannelDimension.LAST:
         image = (image - mean) / std
     else:
-        image = ((image.T - mean) / std).T
+        # reshape mean/std to broadcast along the channel axis rather than transposing the whole
+        # image twice, which would also leave a non-contiguous result
+        broadcast_shape = [1] * image.ndim
+        broadcast_shape[channel_axis] = num_channels
+        image = (image - mean.reshape(broadcast_shape)) / std.reshape(broadcast_shape)
 
     image = to_channel_dimension_format(image, data_format, input_data_format) if data_format is not None else image
     return image
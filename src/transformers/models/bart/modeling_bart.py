@@ -1780,7 +1780,9 @@ class BartForSequenceClassification(BartPreTrainedModel):
 
         eos_mask = input_ids.eq(self.config.eos_token_id).to(hidden_states.device)
 
-        if len(torch.unique_consecutive(eos_mask.sum(1))) > 1:
+        eos_counts = eos_mask.sum(1)
+        # a plain reduction instead of torch.unique_consecutive, which sorts on some backends
+        if (eos_counts != eos_counts[0]).any():
             raise ValueError("All examples must have the same number of <eos> tokens.")
         sentence_representation = hidden_states[eos_mask, :].view(hidden_states.size(0), -1, hidden_states.size(-1))[
             :, -1, :
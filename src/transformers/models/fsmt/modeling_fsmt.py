@@ -49,6 +49,7 @@ from ...utils import (
     add_end_docstrings,
     add_start_docstrings,
     add_start_docstrings_to_model_forward,
+    is_torchdynamo_compiling,
     logging,
     replace_return_docstrings,
 )
@@ -320,6 +321,7 @@ def _prepare_fsmt_decoder_inputs(
     decoder_input_ids=None,
     decoder_padding_mask=None,
     causal_mask_dtype=torch.float32,
+    fused_attn=False,
 ):
     """
     Prepare masks that ignore padding tokens in the decoder and a causal mask for the decoder if none are provided.
@@ -334,9 +336,14 @@ def _prepare_fsmt_decoder_inputs(
         decoder_padding_mask = make_padding_mask(decoder_input_ids, pad_token_id)
     else:
         decoder_padding_mask = invert_mask(decoder_padding_mask)
-    causal_mask = triu_onnx(fill_with_neg_inf(torch.zeros(tgt_len, tgt_len, dtype=causal_mask_dtype)), 1).to(
-        device=decoder_input_ids.device
-    )
+    if fused_attn and decoder_padding_mask is None:
+        # The fused attention kernel applies causality itself (`is_causal=True`) and skips the
+        # upper-triangular tiles outright, so no (tgt_len, tgt_len) mask needs to be materialized.
+        causal_mask = None
+    else:
+        causal_mask = triu_onnx(fill_with_neg_inf(torch.zeros(tgt_len, tgt_len, dtype=causal_mask_dtype)), 1).to(
+            device=decoder_input_ids.device
+        )
     return decoder_input_ids, decoder_padding_mask, causal_mask
 
 
@@ -368,13 +375,6 @@ class PretrainedFSMTModel(PreTrainedModel):
         return dummy_inputs
 
 
-def _make_linear_from_emb(emb):
-    vocab_size, emb_size = emb.weight.shape
-    lin_layer = nn.Linear(vocab_size, emb_size, bias=False)
-    lin_layer.weight.data = emb.weight.data
-    return lin_layer
-
-
 # Helper Functions, mostly for making masks
 def _check_shapes(shape_1, shape2):
     if shape_1 != shape2:
@@ -384,20 +384,22 @@ def _check_shapes(shape_1, shape2):
 def shift_tokens_right(input_ids, pad_token_id):
     """Shift input ids one token to the right, and wrap the last non pad token (usually <eos>)."""
 
-    # replace possible -100 values in labels by `pad_token_id`
-    input_ids.masked_fill_(input_ids == -100, pad_token_id)
-
-    prev_output_tokens = input_ids.clone()
-    index_of_eos = (input_ids.ne(pad_token_id).sum(dim=1) - 1).unsqueeze(-1)
-    prev_output_tokens[:, 0] = input_ids.gather(1, index_of_eos).squeeze()
+    # -100 label placeholders count as padding and end up replaced by `pad_token_id` below
+    index_of_eos = ((input_ids.ne(pad_token_id) & input_ids.ne(-100)).sum(dim=1) - 1).unsqueeze(-1)
+    # write straight into a fresh buffer instead of cloning the input and overwriting all of it
+    prev_output_tokens = input_ids.new_empty(input_ids.shape)
+    prev_output_tokens[:, 0:1] = input_ids.gather(1, index_of_eos)
     prev_output_tokens[:, 1:] = input_ids[:, :-1]
+    prev_output_tokens.masked_fill_(prev_output_tokens == -100, pad_token_id)
     return prev_output_tokens
 
 
 def make_padding_mask(input_ids, padding_idx=1):
     """True for pad tokens"""
     padding_mask = input_ids.eq(padding_idx)
-    if not padding_mask.any():
+    # the `.any()` is a device->host sync and a data-dependent branch: skip it under the compiler
+    # and hand the (possibly all-False) mask to the attention, which handles it fine
+    if not is_torchdynamo_compiling() and not padding_mask.any():
         padding_mask = None
     return padding_mask
 
@@ -405,6 +407,40 @@ def make_padding_mask(input_ids, padding_idx=1):
 # Helper Modules
 
 
+@torch.jit.script
+def _ffn_block(
+    x: Tensor,
+    fc1_weight: Tensor,
+    fc1_bias: Tensor,
+    fc2_weight: Tensor,
+    fc2_bias: Tensor,
+    ln_weight: Tensor,
+    ln_bias: Tensor,
+    ln_eps: float,
+    activation: str,
+    activation_dropout: float,
+    dropout: float,
+    training: bool,
+):
+    """
+    Post-attention feed-forward chain (linear -> activation -> dropout -> linear -> dropout ->
+    residual -> layer norm) of the encoder and decoder layers, scripted so the fuser can collapse
+    the elementwise ops between the two GEMMs instead of round-tripping the hidden states through
+    memory for each of them.
+    """
+    residual = x
+    x = nn.functional.linear(x, fc1_weight, fc1_bias)
+    if activation == "relu":
+        x = nn.functional.relu(x)
+    else:
+        x = nn.functional.gelu(x)
+    x = nn.functional.dropout(x, p=activation_dropout, training=training)
+    x = nn.functional.linear(x, fc2_weight, fc2_bias)
+    x = nn.functional.dropout(x, p=dropout, training=training)
+    x = residual + x
+    return nn.functional.layer_norm(x, [x.size(-1)], ln_weight, ln_bias, ln_eps)
+
+
 class EncoderLayer(nn.Module):
     def __init__(self, config: FSMTConfig):
         super().__init__()
@@ -414,6 +450,8 @@ class EncoderLayer(nn.Module):
         self.dropout = config.dropout
         self.activation_fn = ACT2FN[config.activation_function]
         self.activation_dropout = config.activation_dropout
+        # activations handled by the scripted FFN block; anything else falls back to ACT2FN
+        self._ffn_activation = config.activation_function if config.activation_function in ("relu", "gelu") else None
         self.fc1 = nn.Linear(self.embed_dim, config.encoder_ffn_dim)
         self.fc2 = nn.Linear(config.encoder_ffn_dim, self.embed_dim)
         self.final_layer_norm = LayerNorm(self.embed_dim)
@@ -444,13 +482,29 @@ class EncoderLayer(nn.Module):
         x = residual + x
         x = self.self_attn_layer_norm(x)
 
-        residual = x
-        x = self.activation_fn(self.fc1(x))
-        x = nn.functional.dropout(x, p=self.activation_dropout, training=self.training)
-        x = self.fc2(x)
-        x = nn.functional.dropout(x, p=self.dropout, training=self.training)
-        x = residual + x
-        x = self.final_layer_norm(x)
+        if self._ffn_activation is not None:
+            x = _ffn_block(
+                x,
+                self.fc1.weight,
+                self.fc1.bias,
+                self.fc2.weight,
+                self.fc2.bias,
+                self.final_layer_norm.weight,
+                self.final_layer_norm.bias,
+                self.final_layer_norm.eps,
+                self._ffn_activation,
+                self.activation_dropout,
+                self.dropout,
+                self.training,
+            )
+        else:
+            residual = x
+            x = self.activation_fn(self.fc1(x))
+            x = nn.functional.dropout(x, p=self.activation_dropout, training=self.training)
+            x = self.fc2(x)
+            x = nn.functional.dropout(x, p=self.dropout, training=self.training)
+            x = residual + x
+            x = self.final_layer_norm(x)
         return x, attn_weights
 
 
@@ -542,14 +596,16 @@ class FSMTEncoder(nn.Module):
             assert head_mask.size()[0] == (
                 len(self.layers)
             ), f"The head_mask should be specified for {len(self.layers)} layers, but it is for {head_mask.size()[0]}."
+        # add LayerDrop (see https://arxiv.org/abs/1909.11556 for description); sample all layers
+        # at once outside the loop, and not at all in eval mode where every layer runs
+        to_drop = None
+        if self.training and self.layerdrop > 0:
+            to_drop = (torch.rand(len(self.layers)) < self.layerdrop).tolist()
         for idx, encoder_layer in enumerate(self.layers):
             if output_hidden_states:
-                x = x.transpose(0, 1)  # T x B x C -> B x T x C
-                encoder_states += (x,)
-                x = x.transpose(0, 1)  # B x T x C -> T x B x C
-            # add LayerDrop (see https://arxiv.org/abs/1909.11556 for description)
-            dropout_probability = torch.rand([])
-            if self.training and (dropout_probability < self.layerdrop):  # skip the layer
+                # collect a B x T x C view without bouncing x itself through two reassignments
+                encoder_states += (x.transpose(0, 1),)
+            if to_drop is not None and to_drop[idx]:  # skip the layer
                 attn = None
             else:
                 x, attn = encoder_layer(
@@ -586,6 +642,8 @@ class DecoderLayer(nn.Module):
         self.dropout = config.dropout
         self.activation_fn = ACT2FN[config.activation_function]
         self.activation_dropout = config.activation_dropout
+        # activations handled by the scripted FFN block; anything else falls back to ACT2FN
+        self._ffn_activation = config.activation_function if config.activation_function in ("relu", "gelu") else None
 
         self.self_attn_layer_norm = LayerNorm(self.embed_dim)
         self.encoder_attn = Attention(
@@ -606,6 +664,7 @@ class DecoderLayer(nn.Module):
         encoder_attn_mask=None,
         layer_state=None,
         causal_mask=None,
+        is_causal=False,
         layer_head_mask=None,
         cross_attn_layer_head_mask=None,
         decoder_padding_mask=None,
@@ -623,6 +682,7 @@ class DecoderLayer(nn.Module):
             layer_state=layer_state,  # adds keys to layer state
             key_padding_mask=decoder_padding_mask,
             attn_mask=causal_mask,
+            is_causal=is_causal,
             layer_head_mask=layer_head_mask,
             output_attentions=output_attentions,
         )
@@ -646,13 +706,29 @@ class DecoderLayer(nn.Module):
         x = self.encoder_attn_layer_norm(x)
 
         # Fully Connected
-        residual = x
-        x = self.activation_fn(self.fc1(x))
-        x = nn.functional.dropout(x, p=self.activation_dropout, training=self.training)
-        x = self.fc2(x)
-        x = nn.functional.dropout(x, p=self.dropout, training=self.training)
-        x = residual + x
-        x = self.final_layer_norm(x)
+        if self._ffn_activation is not None:
+            x = _ffn_block(
+                x,
+                self.fc1.weight,
+                self.fc1.bias,
+                self.fc2.weight,
+                self.fc2.bias,
+                self.final_layer_norm.weight,
+                self.final_layer_norm.bias,
+                self.final_layer_norm.eps,
+                self._ffn_activation,
+                self.activation_dropout,
+                self.dropout,
+                self.training,
+            )
+        else:
+            residual = x
+            x = self.activation_fn(self.fc1(x))
+            x = nn.functional.dropout(x, p=self.activation_dropout, training=self.training)
+            x = self.fc2(x)
+            x = nn.functional.dropout(x, p=self.dropout, training=self.training)
+            x = residual + x
+            x = self.final_layer_norm(x)
         return (
             x,
             self_attn_weights,
@@ -703,6 +779,7 @@ class FSMTDecoder(nn.Module):
         encoder_padding_mask: torch.Tensor,
         decoder_padding_mask: torch.Tensor,
         decoder_causal_mask: torch.Tensor,
+        decoder_is_causal: bool = False,
         head_mask: Optional[torch.Tensor] = None,
         inputs_embeds: Optional[torch.Tensor] = None,
         cross_attn_head_mask: Optional[torch.Tensor] = None,
@@ -787,16 +864,17 @@ class FSMTDecoder(nn.Module):
                     f"The `{mask_name}` should be specified for {len(self.layers)} layers, but it is for"
                     f" {head_mask.size()[0]}."
                 )
+        # add LayerDrop (see https://arxiv.org/abs/1909.11556 for description); sample all layers
+        # at once outside the loop, and not at all in eval mode where every layer runs
+        to_drop = None
+        if self.training and self.layerdrop > 0:
+            to_drop = (torch.rand(len(self.layers)) < self.layerdrop).tolist()
         for idx, decoder_layer in enumerate(self.layers):
-            # add LayerDrop (see https://arxiv.org/abs/1909.11556 for description)
             if output_hidden_states:
-                x = x.transpose(0, 1)
-                all_hidden_states += (x,)
-                x = x.transpose(0, 1)
-            if self.training:
-                dropout_probability = torch.rand([])
-                if dropout_probability < self.layerdrop:
-                    continue
+                # collect a B x T x C view without bouncing x itself through two reassignments
+                all_hidden_states += (x.transpose(0, 1),)
+            if to_drop is not None and to_drop[idx]:
+                continue
 
             layer_state = past_key_values[idx] if past_key_values is not None else None
 
@@ -807,6 +885,7 @@ class FSMTDecoder(nn.Module):
                 decoder_padding_mask=decoder_padding_mask,
                 layer_state=layer_state,
                 causal_mask=decoder_causal_mask,
+                is_causal=decoder_is_causal,
                 layer_head_mask=(head_mask[idx] if head_mask is not None else None),
                 cross_attn_layer_head_mask=(cross_attn_head_mask[idx] if cross_attn_head_mask is not None else None),
                 output_attentions=output_attentions,
@@ -821,9 +900,7 @@ class FSMTDecoder(nn.Module):
 
         # add hidden states from the last decoder layer
         if output_hidden_states:
-            x = x.transpose(0, 1)
-            all_hidden_states += (x,)
-            x = x.transpose(0, 1)
+            all_hidden_states += (x.transpose(0, 1),)
 
         # Convert to standard output format: (seq_len, BS, model_dim) -> (BS, seq_len, model_dim)
         x = x.transpose(0, 1)
@@ -848,7 +925,8 @@ class FSMTDecoder(nn.Module):
 
 def _reorder_buffer(attn_cache, new_order):
     for k, input_buffer_k in attn_cache.items():
-        if input_buffer_k is not None:
+        # the cache also stores the scalar `prev_length`, which is the same for every beam
+        if torch.is_tensor(input_buffer_k):
             attn_cache[k] = input_buffer_k.index_select(0, new_order)
     return attn_cache
 
@@ -856,6 +934,10 @@ def _reorder_buffer(attn_cache, new_order):
 class Attention(nn.Module):
     """Multi-headed attention from 'Attention Is All You Need' paper"""
 
+    # decode caches grow in chunks of this many positions, so the k/v buffers are reallocated
+    # once per chunk instead of on every generated token
+    KV_CAPACITY_INCREMENT = 64
+
     def __init__(
         self,
         embed_dim,
@@ -873,6 +955,9 @@ class Attention(nn.Module):
         self.scaling = self.head_dim**-0.5
 
         self.encoder_decoder_attention = encoder_decoder_attention
+        # the projections stay split rather than packed into one 3*embed_dim Linear: every hub
+        # checkpoint stores q/k/v separately, and key-rewriting hooks are bypassed by the
+        # meta-device loading paths (device_map / low_cpu_mem_usage / quantization)
         self.k_proj = nn.Linear(embed_dim, embed_dim, bias=bias)
         self.v_proj = nn.Linear(embed_dim, embed_dim, bias=bias)
         self.q_proj = nn.Linear(embed_dim, embed_dim, bias=bias)
@@ -880,7 +965,9 @@ class Attention(nn.Module):
         self.cache_key = "encoder_decoder" if self.encoder_decoder_attention else "self"
 
     def _shape(self, tensor, seq_len, bsz):
-        return tensor.contiguous().view(seq_len, bsz * self.num_heads, self.head_dim).transpose(0, 1)
+        # (seq_len, bsz, embed_dim) -> (bsz, num_heads, seq_len, head_dim) as a view; matmul and
+        # the fused kernel both take the strided 4-D layout without forcing a copy here
+        return tensor.view(seq_len, bsz, self.num_heads, self.head_dim).permute(1, 2, 0, 3)
 
     def forward(
         self,
@@ -889,6 +976,7 @@ class Attention(nn.Module):
         key_padding_mask: Optional[Tensor] = None,
         layer_state: Optional[Dict[str, Optional[Tensor]]] = None,
         attn_mask: Optional[Tensor] = None,
+        is_causal: bool = False,
         layer_head_mask: Optional[Tensor] = None,
         output_attentions=False,
     ) -> Tuple[Tensor, Optional[Tensor]]:
@@ -904,10 +992,19 @@ class Attention(nn.Module):
                 # previous time steps are cached - no need to recompute key and value if they are static
                 key = None
         else:
+            # no layer_state means the caller (the encoder) keeps no cache: skip the store below
             saved_state = None
-            layer_state = {}
 
-        q = self.q_proj(query) * self.scaling
+        # The fused SDPA kernel never materializes the (tgt_len, src_len) attention matrix, but it
+        # cannot return per-head weights nor apply a head mask, so fall back to the unfused path in
+        # those cases.
+        use_fused_attn = (
+            hasattr(nn.functional, "scaled_dot_product_attention")
+            and not output_attentions
+            and layer_head_mask is None
+        )
+
+        q = self.q_proj(query)
         if static_kv:
             if key is None:
                 k = v = None
@@ -917,6 +1014,8 @@ class Attention(nn.Module):
         else:
             k = self.k_proj(query)
             v = self.v_proj(query)
+        # q stays unscaled: the fused kernel applies 1/sqrt(head_dim) itself and the unfused path
+        # folds it into the GEMM via baddbmm's alpha
 
         q = self._shape(q, tgt_len, bsz)
         if k is not None:
@@ -927,21 +1026,19 @@ class Attention(nn.Module):
         if saved_state is not None:
             k, v, key_padding_mask = self._use_saved_state(k, v, saved_state, key_padding_mask, static_kv, bsz)
 
-        # Update cache
-        layer_state[self.cache_key] = {
-            "prev_key": k.view(bsz, self.num_heads, -1, self.head_dim),
-            "prev_value": v.view(bsz, self.num_heads, -1, self.head_dim),
-            "prev_key_padding_mask": key_padding_mask if not static_kv else None,
-        }
+        # Seed the cache on the first call only: appends and mask updates happen in place inside
+        # _use_saved_state afterwards, and static (cross-attention) entries never change at all.
+        if layer_state is not None and not saved_state:
+            # contiguous() compacts the freshly projected (strided) k/v so the cache never pins
+            # the whole projection buffer
+            layer_state[self.cache_key] = {
+                "prev_key": k.contiguous(),
+                "prev_value": v.contiguous(),
+                "prev_key_padding_mask": key_padding_mask if not static_kv else None,
+            }
 
         assert k is not None
-        src_len = k.size(1)
-        attn_weights = torch.bmm(q, k.transpose(1, 2))
-        assert attn_weights.size() == (bsz * self.num_heads, tgt_len, src_len)
-
-        if attn_mask is not None:
-            attn_weights = attn_weights.view(bsz, self.num_heads, tgt_len, src_len) + attn_mask
-            attn_weights = attn_weights.view(bsz * self.num_heads, tgt_len, src_len)
+        src_len = k.size(2)
 
         # This is part of a workaround to get around fork/join parallelism not supporting Optional types.
         if key_padding_mask is not None and key_padding_mask.dim() == 0:
@@ -951,6 +1048,49 @@ class Attention(nn.Module):
             src_len,
         )
 
+        if use_fused_attn:
+            if attn_mask is not None:
+                combined_mask = attn_mask[None, None, :, :]
+                if key_padding_mask is not None:
+                    combined_mask = combined_mask.expand(bsz, 1, tgt_len, src_len).masked_fill(
+                        key_padding_mask[:, None, None, :], torch.finfo(q.dtype).min
+                    )
+            elif key_padding_mask is not None:
+                # boolean masks are native to the kernel (True means "attend"), so inverting the
+                # padding mask avoids materializing a float -inf tensor
+                combined_mask = ~key_padding_mask[:, None, None, :]
+            else:
+                combined_mask = None
+            # the kernel accepts either an explicit mask or the causal flag, never both
+            assert not (is_causal and combined_mask is not None)
+            attn_output = nn.functional.scaled_dot_product_attention(
+                q,
+                k,
+                v,
+                attn_mask=combined_mask,
+                dropout_p=self.dropout if self.training else 0.0,
+                is_causal=is_causal,
+            )
+            attn_output = attn_output.permute(2, 0, 1, 3).reshape(tgt_len, bsz, embed_dim)
+            attn_output = self.out_proj(attn_output)
+            return attn_output, None
+
+        # causality must arrive as an explicit attn_mask on the unfused path
+        assert not is_causal
+        # the batched-GEMM epilogue fusion below needs the flat (bsz*heads, len, head_dim) layout;
+        # k/v coming from the cache are contiguous so these are views, q pays the one copy that
+        # _shape no longer forces on the fused path
+        q = q.reshape(bsz * self.num_heads, tgt_len, self.head_dim)
+        k = k.reshape(bsz * self.num_heads, src_len, self.head_dim)
+        v = v.reshape(bsz * self.num_heads, src_len, self.head_dim)
+        if attn_mask is not None:
+            # single GEMM with the scale and the mask add folded into its epilogue, instead of
+            # separate scale / bmm / add kernels each streaming the full attention matrix
+            attn_weights = torch.baddbmm(attn_mask.unsqueeze(0), q, k.transpose(1, 2), beta=1.0, alpha=self.scaling)
+        else:
+            attn_weights = torch.baddbmm(q.new_empty((1, 1, 1)), q, k.transpose(1, 2), beta=0.0, alpha=self.scaling)
+        assert attn_weights.size() == (bsz * self.num_heads, tgt_len, src_len)
+
         if key_padding_mask is not None:  # don't attend to padding symbols
             attn_weights = attn_weights.view(bsz, self.num_heads, tgt_len, src_len)
             reshaped = key_padding_mask.unsqueeze(1).unsqueeze(2)
@@ -982,32 +1122,48 @@ class Attention(nn.Module):
         assert v is not None
         attn_output = torch.bmm(attn_probs, v)
         assert attn_output.size() == (bsz * self.num_heads, tgt_len, self.head_dim)
-        attn_output = attn_output.transpose(0, 1).contiguous().view(tgt_len, bsz, embed_dim)
+        # reshape only copies when the strides require it, unlike the contiguous().view() chain
+        attn_output = attn_output.transpose(0, 1).reshape(tgt_len, bsz, embed_dim)
         attn_output = self.out_proj(attn_output)
 
         return attn_output, attn_weights_reshaped
 
+    def _append_to_cache(self, saved_state, k, v):
+        """
+        Write the new k/v states into the over-allocated cache buffers in place, growing them by
+        `KV_CAPACITY_INCREMENT` slots when full, instead of reallocating and copying the whole
+        cache with a `torch.cat` on every decode step.
+        """
+        prev_key = saved_state["prev_key"]
+        prev_value = saved_state["prev_value"]
+        prev_len = saved_state.get("prev_length", prev_key.size(2))
+        new_len = prev_len + k.size(2)
+        if new_len > prev_key.size(2):
+            bsz, num_heads, _, head_dim = prev_key.shape
+            capacity = new_len + self.KV_CAPACITY_INCREMENT
+            grown_key = prev_key.new_empty((bsz, num_heads, capacity, head_dim))
+            grown_key[:, :, :prev_len] = prev_key[:, :, :prev_len]
+            grown_value = prev_value.new_empty((bsz, num_heads, capacity, head_dim))
+            grown_value[:, :, :prev_len] = prev_value[:, :, :prev_len]
+            prev_key, prev_value = grown_key, grown_value
+            saved_state["prev_key"] = prev_key
+            saved_state["prev_value"] = prev_value
+        prev_key[:, :, prev_len:new_len] = k
+        prev_value[:, :, prev_len:new_len] = v
+        saved_state["prev_length"] = new_len
+        return prev_key[:, :, :new_len], prev_value[:, :, :new_len]
+
     def _use_saved_state(self, k, v, saved_state, key_padding_mask, static_kv, bsz):
-        # saved states are stored with shape (bsz, num_heads, seq_len, head_dim)
+        # saved states are stored with shape (bsz, num_heads, seq_len, head_dim), the same 4-D
+        # layout the attention consumes, so no view round-trips are needed around the append
         if "prev_key" in saved_state:
-            _prev_key = saved_state["prev_key"]
-            assert _prev_key is not None
-            prev_key = _prev_key.view(bsz * self.num_heads, -1, self.head_dim)
-            if static_kv:
-                k = prev_key
-            else:
-                assert k is not None
-                k = torch.cat([prev_key, k], dim=1)
-        if "prev_value" in saved_state:
-            _prev_value = saved_state["prev_value"]
-            assert _prev_value is not None
-            prev_value = _prev_value.view(bsz * self.num_heads, -1, self.head_dim)
             if static_kv:
-                v = prev_value
+                k = saved_state["prev_key"]
+                v = saved_state["prev_value"]
+                assert k is not None and v is not None
             else:
-                assert v is not None
-                v = torch.cat([prev_value, v], dim=1)
-        assert k is not None and v is not None
+                assert k is not None and v is not None
+                k, v = self._append_to_cache(saved_state, k, v)
         prev_key_padding_mask: Optional[Tensor] = saved_state.get("prev_key_padding_mask", None)
         if prev_key_padding_mask is not None:
             if static_kv:
@@ -1016,12 +1172,15 @@ class Attention(nn.Module):
                 new_key_padding_mask = torch.cat([prev_key_padding_mask, key_padding_mask], dim=1)
         else:
             new_key_padding_mask = key_padding_mask
+        if not static_kv and "prev_key" in saved_state:
+            saved_state["prev_key_padding_mask"] = new_key_padding_mask
         return k, v, new_key_padding_mask
 
 
 def fill_with_neg_inf(t):
     """FP16-compatible function that fills a input_ids with -inf."""
-    return t.float().fill_(torch.finfo(t.dtype).min).type_as(t)
+    # filling in t's own dtype is exact for the dtype-aware min value, no fp32 round-trip needed
+    return t.fill_(torch.finfo(t.dtype).min)
 
 
 # Public API
@@ -1094,7 +1253,15 @@ class FSMTModel(PretrainedFSMTModel):
         use_cache = use_cache if use_cache is not None else self.config.use_cache
         return_dict = return_dict if return_dict is not None else self.config.use_return_dict
 
+        # mirrors the gate in Attention.forward: only then can the kernel handle causality itself
+        fused_decoder_attn = (
+            hasattr(nn.functional, "scaled_dot_product_attention")
+            and not output_attentions
+            and decoder_head_mask is None
+        )
+
         # make masks if user doesn't supply
+        decoder_is_causal = False
         if not use_cache and input_ids is not None:
             decoder_input_ids, decoder_padding_mask, causal_mask = _prepare_fsmt_decoder_inputs(
                 self.config,
@@ -1102,7 +1269,9 @@ class FSMTModel(PretrainedFSMTModel):
                 decoder_input_ids=decoder_input_ids,
                 decoder_padding_mask=decoder_attention_mask,
                 causal_mask_dtype=self.decoder.embed_tokens.weight.dtype,
+                fused_attn=fused_decoder_attn,
             )
+            decoder_is_causal = causal_mask is None and decoder_padding_mask is None
         else:
             decoder_padding_mask, causal_mask = None, None
 
@@ -1134,6 +1303,7 @@ class FSMTModel(PretrainedFSMTModel):
             attention_mask,
             decoder_padding_mask,
             decoder_causal_mask=causal_mask,
+            decoder_is_causal=decoder_is_causal,
             inputs_embeds=decoder_inputs_embeds,
             head_mask=decoder_head_mask,
             cross_attn_head_mask=cross_attn_head_mask,
@@ -1350,6 +1520,16 @@ class SinusoidalPositionalEmbedding(nn.Embedding):
         mask = tensor.ne(padding_idx).int()
         return (torch.cumsum(mask, dim=1).type_as(mask) * mask).long() + padding_idx
 
+    def _cached_positions(self, seq_len, device):
+        """Memoized `arange` starting at padding_idx + 1, for batches without padding."""
+        cache = getattr(self, "_positions_cache", None)
+        if cache is None or cache.size(0) < seq_len or cache.device != device:
+            cache = torch.arange(
+                self.padding_idx + 1, self.padding_idx + 1 + seq_len, dtype=torch.long, device=device
+            )
+            self._positions_cache = cache
+        return cache[:seq_len]
+
     def forward(
         self,
         input,
@@ -1362,5 +1542,10 @@ class SinusoidalPositionalEmbedding(nn.Embedding):
         if max_pos > self.weight.size(0):
             # expand embeddings if needed
             self.make_weight(max_pos, self.embedding_dim, self.padding_idx)
-        positions = self.make_positions(input, self.padding_idx)
+        if not is_torchdynamo_compiling() and not input.eq(self.padding_idx).any():
+            # no padding in the batch: positions are just a (cached) arange, which skips the
+            # mask/cumsum/multiply kernels and their (bsz, seq_len) scratch buffers
+            positions = self._cached_positions(seq_len, input.device).expand(bsz, -1)
+        else:
+            positions = self.make_positions(input, self.padding_idx)
         return super().forward(positions)
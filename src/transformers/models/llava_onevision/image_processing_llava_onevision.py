@@ -91,8 +91,23 @@ def divide_to_patches(image: np.array, patch_size: int, input_data_format) -> Li
     Returns:
         list: A list of np.array representing the patches.
     """
-    patches = []
     height, width = get_image_size(image, channel_dim=input_data_format)
+    if height % patch_size == 0 and width % patch_size == 0:
+        # every patch is full-size, so carve them all out with one strided reshape instead of a
+        # Python-level slice per patch
+        if input_data_format == ChannelDimension.LAST:
+            num_channels = image.shape[-1]
+            patches = image.reshape(
+                height // patch_size, patch_size, width // patch_size, patch_size, num_channels
+            ).transpose(0, 2, 1, 3, 4)
+            return list(patches.reshape(-1, patch_size, patch_size, num_channels))
+        num_channels = image.shape[-3]
+        patches = image.reshape(
+            num_channels, height // patch_size, patch_size, width // patch_size, patch_size
+        ).transpose(1, 3, 0, 2, 4)
+        return list(patches.reshape(-1, num_channels, patch_size, patch_size))
+
+    patches = []
     for i in range(0, height, patch_size):
         for j in range(0, width, patch_size):
             if input_data_format == ChannelDimension.LAST:
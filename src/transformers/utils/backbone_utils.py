@@ -21,7 +21,10 @@ from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple, Union
 
 
 if TYPE_CHECKING:
+    import torch
+
     from ..configuration_utils import PretrainedConfig
+    from ..modeling_outputs import BackboneOutput
 
 
 class BackboneType(enum.Enum):
@@ -227,20 +230,28 @@ class BackboneMixin:
 
     @property
     def channels(self):
-        return [self.out_feature_channels[name] for name in self.out_features]
+        # Grab the mapping once: `out_feature_channels` is a property that rebuilds its dict on
+        # every access, so indexing it per feature would reconstruct it len(out_features) times.
+        out_feature_channels = self.out_feature_channels
+        return [out_feature_channels[name] for name in self.out_features]
 
     def forward_with_filtered_kwargs(self, *args, **kwargs):
-        signature = dict(inspect.signature(self.forward).parameters)
+        # The signature of `forward` is fixed per class, so it is resolved once and cached instead
+        # of being re-inspected on every call.
+        signature = getattr(self, "_forward_signature", None)
+        if signature is None:
+            signature = frozenset(inspect.signature(self.forward).parameters)
+            self._forward_signature = signature
         filtered_kwargs = {k: v for k, v in kwargs.items() if k in signature}
         return self(*args, **filtered_kwargs)
 
     def forward(
         self,
-        pixel_values,
+        pixel_values: "torch.Tensor",
         output_hidden_states: Optional[bool] = None,
         output_attentions: Optional[bool] = None,
         return_dict: Optional[bool] = None,
-    ):
+    ) -> "BackboneOutput":
         raise NotImplementedError("This method should be implemented by the derived class.")
 
     def to_dict(self):
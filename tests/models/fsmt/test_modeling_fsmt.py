@@ -218,6 +218,7 @@ class FSMTModelTest(ModelTesterMixin, GenerationTesterMixin, PipelineTesterMixin
 
         _check_var(model.encoder.embed_tokens)
         _check_var(model.encoder.layers[0].self_attn.k_proj)
+        _check_var(model.decoder.layers[0].encoder_attn.k_proj)
         _check_var(model.encoder.layers[0].fc1)
         # XXX: different std for fairseq version of SinusoidalPositionalEmbedding
         # self.assertAlmostEqual(torch.std(model.encoder.embed_positions.weights).item(), config.init_std, 2)